@@ -0,0 +1,303 @@
+"""
+公共常量与辅助函数
+供 Vercel Handler (api/index.py) 与 FastAPI 服务 (server.py) 共用
+"""
+
+import hashlib
+import re
+import time
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Optional
+
+
+# 知名厂商/系列列表（用于判断是否显示"明星团队"按钮）
+NOTABLE_DEVELOPERS = frozenset({
+    # 日本大厂
+    "Nintendo", "Nintendo EPD", "Nintendo EAD",
+    "Square Enix", "Square", "Enix",
+    "Bandai Namco", "Bandai Namco Entertainment", "Bandai Namco Studios",
+    "Capcom", "CAPCOM",
+    "Konami", "Konami Digital Entertainment",
+    "SEGA", "Sega",
+    "Atlus", "ATLUS",
+    "Koei Tecmo", "Koei Tecmo Games", "Omega Force", "Team Ninja",
+    "Level-5", "Level5",
+    "FromSoftware", "From Software",
+    "PlatinumGames", "Platinum Games",
+    "Falcom", "Nihon Falcom",
+    "NIS", "Nippon Ichi Software",
+    "Arc System Works",
+    "Spike Chunsoft",
+    "Grasshopper Manufacture",
+    "Vanillaware",
+    "Game Freak",
+    "HAL Laboratory",
+    "Intelligent Systems",
+    "Monolith Soft",
+    "Retro Studios",
+    # 欧美大厂
+    "Ubisoft", "Ubisoft Montreal", "Ubisoft Paris",
+    "Electronic Arts", "EA", "EA Sports",
+    "Activision", "Activision Blizzard",
+    "Blizzard", "Blizzard Entertainment",
+    "Bethesda", "Bethesda Game Studios", "Bethesda Softworks",
+    "2K Games", "2K", "Firaxis Games",
+    "Rockstar Games", "Rockstar North",
+    "Warner Bros", "WB Games",
+    "CD Projekt", "CD Projekt Red",
+    "Devolver Digital",
+    "505 Games",
+    "THQ Nordic",
+    # 独立游戏知名工作室
+    "Team Cherry",
+    "Supergiant Games",
+    "Moon Studios",
+    "Yacht Club Games",
+    "Motion Twin",
+    "ConcernedApe",
+})
+
+# hypes 阈值
+NOTABLE_HYPES_THRESHOLD = 10
+
+# 预先转为小写，避免每次匹配时重复 lower()
+# 去重（如 Capcom/CAPCOM）并排序，使生成的正则和拼接串在各进程间一致
+_NOTABLE_LOWER = tuple(sorted({n.lower() for n in NOTABLE_DEVELOPERS}))
+
+# 公司名出现在知名厂商名中：在拼接串里做一次子串查找（\0 不会出现在公司名中）
+_NOTABLE_JOINED = "\0".join(_NOTABLE_LOWER)
+
+
+class TTLCache:
+    """
+    简单的进程内 TTL 缓存
+
+    warm 实例之间复用 IGDB 查询和翻译结果，超过 maxsize 时淘汰最早写入的条目
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取缓存，过期或不存在时返回 None"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """写入缓存"""
+        self._data.pop(key, None)
+        if len(self._data) >= self.maxsize:
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+
+# 进程内缓存（warm 实例内复用）：IGDB 列表 10 分钟，中文名 24 小时
+_games_cache = TTLCache(maxsize=128, ttl=600)
+_translation_cache = TTLCache(maxsize=128, ttl=24 * 3600)
+
+
+@lru_cache(maxsize=4096)
+def format_date(timestamp: Optional[int]) -> Optional[str]:
+    """格式化时间戳（同一天发售的游戏时间戳大量重复，结果可缓存）"""
+    if not timestamp:
+        return None
+    t = time.gmtime(timestamp)
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+
+
+def get_genres(game: dict) -> list[str]:
+    """获取游戏类型"""
+    genres = game.get("genres", [])
+    if not genres:
+        return []
+    return [g.get("name", "") for g in genres if isinstance(g, dict) and g.get("name")]
+
+
+def get_cover_url(game: dict) -> Optional[str]:
+    """获取封面图 URL"""
+    cover = game.get("cover")
+    if isinstance(cover, dict):
+        url = cover.get("url")
+        if url:
+            # 转换为大图（IGDB 图片 URL 中只有一处尺寸标记）
+            return url.replace("t_thumb", "t_cover_big", 1)
+    return None
+
+
+@lru_cache(maxsize=1)
+def _notable_re() -> re.Pattern:
+    """
+    知名厂商名出现在公司名中：一次正则扫描代替逐个子串比较
+
+    首次使用时才编译，只请求深度信息的冷启动无需承担编译开销
+    """
+    return re.compile("|".join(re.escape(n) for n in _NOTABLE_LOWER))
+
+
+@lru_cache(maxsize=2048)
+def _is_notable_company(company_name: str) -> bool:
+    """
+    公司名（小写）是否匹配知名厂商，支持双向部分匹配
+
+    同一发行商在一个月的列表里会反复出现，按公司名缓存匹配结果
+    """
+    return company_name in _NOTABLE_JOINED or bool(_notable_re().search(company_name))
+
+
+def convert_game(game: dict, cn_name: Optional[str] = None) -> dict:
+    """
+    转换游戏数据格式
+
+    只遍历一次 involved_companies，同时得到开发商、发行商和知名厂商标记
+    """
+    developers = []
+    publishers = []
+    is_notable = (game.get("hypes") or 0) >= NOTABLE_HYPES_THRESHOLD
+
+    for ic in game.get("involved_companies") or ():
+        company = ic.get("company")
+        if not isinstance(company, dict):
+            continue
+        company_name = company.get("name", "")
+        # 空公司名是任意字符串的子串，不能参与知名厂商匹配
+        if not company_name:
+            continue
+        if ic.get("developer"):
+            developers.append(company_name)
+        if ic.get("publisher"):
+            publishers.append(company_name)
+        if not is_notable:
+            is_notable = _is_notable_company(company_name.lower())
+
+    return {
+        "id": game.get("id", 0),
+        "name": game.get("name", "Unknown"),
+        "name_cn": cn_name,
+        "release_date": format_date(game.get("first_release_date")),
+        "developer": ", ".join(developers) or None,
+        "publisher": ", ".join(publishers) or None,
+        "genres": get_genres(game),
+        "summary": game.get("summary"),
+        "cover_url": get_cover_url(game),
+        "is_notable": is_notable
+    }
+
+
+def get_game_list(
+    igdb_client,
+    translate_names: Callable[[list[str]], dict[str, str]],
+    year: int,
+    month: int,
+    limit: int,
+    translate: bool
+) -> list[dict]:
+    """
+    获取指定月份的 Switch 新游并转换格式，IGDB 列表和中文名都经过进程内缓存
+
+    同步执行（内部会发起 HTTP 请求），异步调用方需放到线程中运行
+    """
+    platform_id = igdb_client.PLATFORM_SWITCH
+    games_key = (platform_id, year, month, limit)
+    games = _games_cache.get(games_key)
+    if games is None:
+        games = igdb_client.get_upcoming_games(
+            platform_id=platform_id,
+            year=year,
+            month=month,
+            limit=limit
+        )
+        # 请求失败时返回空列表，不缓存
+        if games:
+            _games_cache.set(games_key, games)
+
+    cn_names = {}
+    if translate and games:
+        english_names = [g.get("name", "") for g in games if g.get("name")]
+        names_key = tuple(sorted(english_names))
+        cn_names = _translation_cache.get(names_key)
+        if cn_names is None:
+            cn_names = translate_names(english_names)
+            # 全部原样返回通常意味着 LLM 不可用，不缓存
+            if any(cn != en for en, cn in cn_names.items()):
+                _translation_cache.set(names_key, cn_names)
+
+    game_list = []
+    for game in games:
+        en_name = game.get("name", "")
+        cn_name = cn_names.get(en_name)
+        # 中文名和英文名相同时视为没有中文名
+        if cn_name == en_name:
+            cn_name = None
+        game_list.append(convert_game(game, cn_name))
+    return game_list
+
+
+def convert_details(game_name: str, details) -> dict:
+    """
+    转换深度信息格式
+
+    details 为 detail_fetcher.GameDetails；为空时返回空数据，让前端显示"暂无信息"
+    """
+    if not details:
+        return {
+            "name": game_name,
+            "directors": [],
+            "writers": [],
+            "composers": [],
+            "producers": [],
+            "series": None,
+            "related_games": [],
+            "highlights": []
+        }
+
+    return {
+        "name": details.name,
+        "directors": [{"name": d.name, "known_for": d.known_for} for d in details.directors],
+        "writers": [{"name": w.name, "known_for": w.known_for} for w in details.writers],
+        "composers": [{"name": c.name, "known_for": c.known_for} for c in details.composers],
+        "producers": [{"name": p.name, "known_for": p.known_for} for p in details.producers],
+        "series": details.series or None,
+        "related_games": details.related_games,
+        "highlights": details.highlights
+    }
+
+
+def is_complete_games(games: list[dict], translate: bool) -> bool:
+    """
+    游戏列表是否完整，可交给客户端缓存（ETag/304）
+
+    IGDB 请求失败时列表为空，LLM 不可用时翻译不出任何中文名，这类结果不应被客户端长期复用
+    """
+    if not games:
+        return False
+    return not translate or any(g["name_cn"] for g in games)
+
+
+def make_etag(body: bytes) -> str:
+    """根据响应体生成强 ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _strip_weak(tag: str) -> str:
+    """去掉弱 ETag 的 W/ 前缀"""
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """
+    判断 If-None-Match 请求头是否命中当前 ETag
+
+    If-None-Match 按弱比较：CDN、gzip 代理常把 ETag 改成 W/"..."，同样应返回 304
+    """
+    if not if_none_match:
+        return False
+    tags = {_strip_weak(tag.strip()) for tag in if_none_match.split(",")}
+    return "*" in tags or _strip_weak(etag) in tags
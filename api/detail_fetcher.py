@@ -3,13 +3,130 @@
 使用 LLM + Web Search 获取游戏的制作人、编剧、编曲等深度信息
 """
 
+import hashlib
 import os
-import json
+import re
+import orjson
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 
+from dotenv import load_dotenv
 
-@dataclass
+from disk_cache import DiskCache
+from http_session import SessionOwner, create_session
+
+
+# 中文字符（CJK 统一表意文字基本区）
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# markdown 代码块
+_CODE_BLOCK_RE = re.compile(r"```(?:json)?(.*?)(?:```|$)", re.S)
+
+
+def _extract_json(content: str, open_char: str, close_char: str) -> str:
+    """
+    从 LLM 回复中提取 JSON 文本
+    
+    去掉可能的 markdown 代码块，再截取首个 open_char 到最后一个 close_char 之间的内容
+    """
+    match = _CODE_BLOCK_RE.search(content)
+    if match:
+        content = match.group(1)
+    
+    start = content.find(open_char)
+    end = content.rfind(close_char) + 1
+    if start != -1 and end > start:
+        content = content[start:end]
+    
+    return content.strip()
+
+
+# 内置的常见游戏官方译名表
+_KNOWN_TRANSLATIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "known_translations.json")
+
+# 所有获取器共用的 LLM 响应缓存（7 天）
+_LLM_CACHE = DiskCache("llm", ttl=7 * 86400)
+
+# 按游戏名缓存的中文译名（7 天），不同批次组合之间也能复用
+_TRANSLATION_CACHE = DiskCache("translations", ttl=7 * 86400)
+
+
+# 深度信息查询的系统提示
+# 固定的说明和输出格式都放在这里，每次请求的前缀完全一致，便于服务端复用提示缓存
+_SYSTEM_PROMPT = """你是一个游戏行业专家，精通游戏制作人员信息。请基于你的知识回答问题，用 JSON 格式返回。
+
+用户会给出游戏名和已知信息，请提供以下信息（如果能找到）:
+1. 监督/导演 (Director) - 姓名及其代表作
+2. 编剧/剧本 (Writer/Scenario) - 姓名及其代表作
+3. 作曲/音乐 (Composer/Music) - 姓名及其代表作
+4. 制作人 (Producer) - 姓名及其代表作
+5. 所属游戏系列
+6. 值得关注的亮点（如：某知名制作人的新作、某经典系列续作等）
+
+请用以下 JSON 格式返回，找不到的字段留空数组:
+{
+    "directors": [{"name": "姓名", "known_for": ["代表作1", "代表作2"]}],
+    "writers": [{"name": "姓名", "known_for": ["代表作1"]}],
+    "composers": [{"name": "姓名", "known_for": ["代表作1"]}],
+    "producers": [{"name": "姓名", "known_for": ["代表作1"]}],
+    "series": "系列名称",
+    "related_games": ["同制作人的其他作品"],
+    "highlights": ["亮点1", "亮点2"]
+}
+
+只返回 JSON，不要其他内容。如果完全找不到信息，返回空对象 {}。"""
+
+# 深度信息查询的用户提示模板（只包含每次变化的部分）
+_PROMPT_TEMPLATE = """请根据你的知识，整理游戏《{game_name}》的详细制作信息。{name_hint}
+
+已知信息:
+{context}"""
+
+# 游戏名翻译的系统提示
+_TRANSLATE_SYSTEM_PROMPT = """你是游戏翻译专家。只提供你100%确定的官方中文译名，不确定的保留英文名。绝对不要混淆不同的游戏系列。
+
+用户会给出带序号的游戏列表。请逐个分析每个游戏，按列表顺序返回 JSON 数组。每个元素包含：
+- "id": 游戏在列表中的序号
+- "en": 原英文名（必须与游戏列表中完全一致，直接复制）
+- "cn": 官方中文名
+- "sure": 布尔值，true 表示你100%确定这是正确的官方译名，false 表示不确定
+
+重要规则：
+1. 只填写你100%确定的官方中文译名
+2. 如果你不确定、没听说过这个游戏、或者这个游戏没有中文名，cn 填英文名，sure 填 false
+3. 不要猜测，不要自己翻译，宁可保留英文名也不要填错误的中文名
+4. Tales 系列是"传说"系列，不是"异闻录"；Bayonetta 是"猎天使魔女"
+
+示例：
+[
+  {"id": 1, "en": "The Legend of Zelda: Tears of the Kingdom", "cn": "塞尔达传说：王国之泪", "sure": true},
+  {"id": 2, "en": "Some Unknown Indie Game", "cn": "Some Unknown Indie Game", "sure": false}
+]
+
+只返回 JSON 数组。"""
+
+# 已知信息字段 -> 提示中的标签
+_CONTEXT_FIELDS = (
+    ("developer", "开发商"),
+    ("publisher", "发行商"),
+    ("release_date", "发售日期"),
+    ("english_name", "英文名"),
+    ("chinese_name", "中文名"),
+)
+
+# LLM 返回的字段 -> 制作人员角色
+_CREDIT_ROLES = (
+    ("directors", "director"),
+    ("writers", "writer"),
+    ("composers", "composer"),
+    ("producers", "producer"),
+)
+
+
+@dataclass(slots=True)
 class GameCredit:
     """游戏制作人员信息"""
     name: str
@@ -17,7 +134,7 @@ class GameCredit:
     known_for: list[str] = field(default_factory=list)  # 代表作品
 
 
-@dataclass
+@dataclass(slots=True)
 class GameDetails:
     """游戏深度信息"""
     name: str
@@ -39,76 +156,127 @@ class GameDetails:
     source_urls: list[str] = field(default_factory=list)    # 信息来源
 
 
-class DetailFetcher:
+class DetailFetcher(SessionOwner):
     """深度信息获取器基类"""
     
+    def __init__(self):
+        # 复用 TCP/TLS 连接，避免每次请求重新握手
+        self.session = create_session()
+        # LLM 响应缓存，相同请求不再重复调用
+        self.cache = _LLM_CACHE
+    
     def fetch(self, game_name: str, basic_info: dict = None) -> Optional[GameDetails]:
         """获取游戏深度信息"""
         raise NotImplementedError
+    
+    def fetch_many(self, game_names: list[str], max_concurrency: int = 8) -> dict[str, Optional[GameDetails]]:
+        """
+        并发获取多个游戏的深度信息
+        
+        Args:
+            game_names: 游戏名列表
+            max_concurrency: 同时进行的请求数上限
+            
+        Returns:
+            {游戏名: 深度信息} 字典，获取失败的为 None
+        """
+        if not game_names:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(game_names))) as pool:
+            return dict(zip(game_names, pool.map(self.fetch, game_names)))
 
 
-class OpenAIDetailFetcher(DetailFetcher):
-    """使用 OpenAI API 获取深度信息"""
+class _ChatCompletionsFetcher(DetailFetcher):
+    """
+    OpenAI 兼容 Chat Completions 接口的公共实现
     
-    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+    子类只需提供默认 API 地址和模型
+    """
+    
+    def __init__(self, api_key: str, model: str, base_url: str):
+        super().__init__()
         self.api_key = api_key
         self.model = model
-        self.base_url = "https://api.openai.com/v1/chat/completions"
+        self.base_url = base_url
+    
+    def _payload_extras(self) -> dict:
+        """供应商特有的请求参数"""
+        return {}
     
     def _build_prompt(self, game_name: str, basic_info: dict = None) -> str:
         """构建搜索提示"""
         context = ""
         if basic_info:
-            if basic_info.get("developer"):
-                context += f"开发商: {basic_info['developer']}\n"
-            if basic_info.get("publisher"):
-                context += f"发行商: {basic_info['publisher']}\n"
-            if basic_info.get("release_date"):
-                context += f"发售日期: {basic_info['release_date']}\n"
+            # 与查询名相同的值（如英文名/中文名）不提供额外信息，跳过
+            context = "".join(
+                f"{label}: {value}\n"
+                for key, label in _CONTEXT_FIELDS
+                if (value := basic_info.get(key)) and value != game_name
+            )
         
-        return f"""请搜索并整理游戏《{game_name}》的详细制作信息。
-
-已知信息:
-{context if context else "无"}
-
-请提供以下信息（如果能找到）:
-1. 监督/导演 (Director) - 姓名及其代表作
-2. 编剧/剧本 (Writer/Scenario) - 姓名及其代表作
-3. 作曲/音乐 (Composer/Music) - 姓名及其代表作
-4. 制作人 (Producer) - 姓名及其代表作
-5. 所属游戏系列
-6. 值得关注的亮点（如：某知名制作人的新作、某经典系列续作等）
-
-请用以下 JSON 格式返回，找不到的字段留空数组:
-{{
-    "directors": [{{"name": "姓名", "known_for": ["代表作1", "代表作2"]}}],
-    "writers": [{{"name": "姓名", "known_for": ["代表作1"]}}],
-    "composers": [{{"name": "姓名", "known_for": ["代表作1"]}}],
-    "producers": [{{"name": "姓名", "known_for": ["代表作1"]}}],
-    "series": "系列名称",
-    "related_games": ["同制作人的其他作品"],
-    "highlights": ["亮点1", "亮点2"]
-}}
-
-只返回 JSON，不要其他内容。如果完全找不到信息，返回空对象 {{}}。"""
-
+        # 判断输入的是否是英文名（不包含中文字符）
+        is_english = _CJK_RE.search(game_name) is None
+        
+        name_hint = ""
+        if is_english:
+            name_hint = f"\n注意：《{game_name}》是英文名，请先识别其对应的中文名（如有），然后基于你对该游戏的了解来回答。"
+        
+        return _PROMPT_TEMPLATE.format(
+            game_name=game_name,
+            name_hint=name_hint,
+            context=context or "无"
+        )
+    
+    def _complete(self, payload: dict, timeout: float, open_char: str, close_char: str, expected_type: type):
+        """
+        请求 Chat Completions 并解析回复中的 JSON
+        
+        相同请求直接复用缓存的解析结果；回复不是 expected_type 时返回 None，且不写入缓存，下次重新请求
+        请求失败（含响应体不是 JSON）抛出 requests.RequestException，
+        模型回复中的 JSON 解析失败抛出 orjson.JSONDecodeError，由调用方处理
+        """
+        cache_key = DiskCache.make_key(self.base_url, payload)
+        data = self.cache.get(cache_key)
+        # 命中（且不是旧版本写入的异常结果）时直接返回
+        if isinstance(data, expected_type):
+            return data
+        
+        response = self.session.post(
+            self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            },
+            data=orjson.dumps(payload),
+            timeout=timeout
+        )
+        response.raise_for_status()
+        
+        # 响应体本身不是 JSON（如代理返回的 HTML 页面）属于请求失败，与模型回复解析失败区分开
+        try:
+            result = orjson.loads(response.content)
+        except orjson.JSONDecodeError as e:
+            raise requests.RequestException(f"响应不是 JSON: {e}", response=response) from e
+        content = result["choices"][0]["message"]["content"]
+        
+        data = orjson.loads(_extract_json(content, open_char, close_char))
+        if not isinstance(data, expected_type):
+            print(f"返回格式错误: 期望 {expected_type.__name__}，实际为 {type(data).__name__}")
+            return None
+        self.cache.set(cache_key, data)
+        return data
+    
     def fetch(self, game_name: str, basic_info: dict = None) -> Optional[GameDetails]:
         """获取游戏深度信息"""
-        import requests
-        
         prompt = self._build_prompt(game_name, basic_info)
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": self.model,
             "messages": [
                 {
                     "role": "system",
-                    "content": "你是一个游戏行业专家，精通游戏制作人员信息。请基于你的知识回答问题，用 JSON 格式返回。"
+                    "content": _SYSTEM_PROMPT
                 },
                 {
                     "role": "user", 
@@ -118,58 +286,25 @@ class OpenAIDetailFetcher(DetailFetcher):
             "temperature": 0.3,
             "max_tokens": 1500
         }
+        payload.update(self._payload_extras())
         
         try:
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-            
-            # 解析 JSON
-            # 处理可能的 markdown 代码块
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            
-            data = json.loads(content.strip())
+            data = self._complete(payload, 30, "{", "}", dict)
+            if data is None:
+                return None
             
             # 构建 GameDetails
             details = GameDetails(name=game_name)
             
-            for d in data.get("directors", []):
-                details.directors.append(GameCredit(
-                    name=d.get("name", ""),
-                    role="director",
-                    known_for=d.get("known_for", [])
-                ))
-            
-            for w in data.get("writers", []):
-                details.writers.append(GameCredit(
-                    name=w.get("name", ""),
-                    role="writer",
-                    known_for=w.get("known_for", [])
-                ))
-            
-            for c in data.get("composers", []):
-                details.composers.append(GameCredit(
-                    name=c.get("name", ""),
-                    role="composer",
-                    known_for=c.get("known_for", [])
-                ))
-            
-            for p in data.get("producers", []):
-                details.producers.append(GameCredit(
-                    name=p.get("name", ""),
-                    role="producer",
-                    known_for=p.get("known_for", [])
-                ))
+            for key, role in _CREDIT_ROLES:
+                credits = getattr(details, key)
+                for c in data.get(key, []):
+                    if c.get("name"):
+                        credits.append(GameCredit(
+                            name=c["name"],
+                            role=role,
+                            known_for=c.get("known_for", [])
+                        ))
             
             details.series = data.get("series", "")
             details.related_games = data.get("related_games", [])
@@ -179,8 +314,10 @@ class OpenAIDetailFetcher(DetailFetcher):
             
         except requests.RequestException as e:
             print(f"API 请求失败: {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                print(f"响应内容: {e.response.text}")
             return None
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             print(f"JSON 解析失败: {e}")
             return None
         except Exception as e:
@@ -188,7 +325,27 @@ class OpenAIDetailFetcher(DetailFetcher):
             return None
 
 
-class DoubaoDetailFetcher(DetailFetcher):
+class OpenAIDetailFetcher(_ChatCompletionsFetcher):
+    """使用 OpenAI API 获取深度信息"""
+    
+    DEFAULT_BASE_URL = "https://api.openai.com/v1/chat/completions"
+    
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
+        super().__init__(api_key, model, self.DEFAULT_BASE_URL)
+    
+    def _payload_extras(self) -> dict:
+        """
+        OpenAI 提示缓存路由键
+        
+        系统提示相同的请求落到同一缓存；其他兼容服务不一定接受该字段，仅对官方地址发送
+        """
+        if self.base_url != self.DEFAULT_BASE_URL:
+            return {}
+        key = hashlib.sha1((self.model + _SYSTEM_PROMPT).encode("utf-8")).hexdigest()
+        return {"prompt_cache_key": key}
+
+
+class DoubaoDetailFetcher(_ChatCompletionsFetcher):
     """使用豆包大模型 (火山方舟) 获取深度信息"""
     
     # 火山方舟默认 API 地址
@@ -203,189 +360,42 @@ class DoubaoDetailFetcher(DetailFetcher):
             endpoint_id: 推理接入点 ID (如: ep-202xxxxx-xxxxx)
             base_url: 可选的自定义 API 地址
         """
-        self.api_key = api_key
+        # 豆包使用 endpoint_id 作为 model
+        super().__init__(api_key, endpoint_id, base_url or self.DEFAULT_BASE_URL)
         self.endpoint_id = endpoint_id
-        self.base_url = base_url or self.DEFAULT_BASE_URL
     
-    def _build_prompt(self, game_name: str, basic_info: dict = None) -> str:
-        """构建搜索提示"""
-        context = ""
-        if basic_info:
-            if basic_info.get("developer"):
-                context += f"开发商: {basic_info['developer']}\n"
-            if basic_info.get("publisher"):
-                context += f"发行商: {basic_info['publisher']}\n"
-            if basic_info.get("release_date"):
-                context += f"发售日期: {basic_info['release_date']}\n"
-            # 如果有英文名，也加入上下文
-            if basic_info.get("english_name") and basic_info.get("english_name") != game_name:
-                context += f"英文名: {basic_info['english_name']}\n"
-            if basic_info.get("chinese_name") and basic_info.get("chinese_name") != game_name:
-                context += f"中文名: {basic_info['chinese_name']}\n"
-        
-        # 判断输入的是否是英文名（不包含中文字符）
-        is_english = not any('\u4e00' <= char <= '\u9fff' for char in game_name)
-        
-        name_hint = ""
-        if is_english:
-            name_hint = f"\n注意：《{game_name}》是英文名，请先识别其对应的中文名（如有），然后基于你对该游戏的了解来回答。"
-        
-        return f"""请根据你的知识，整理游戏《{game_name}》的详细制作信息。{name_hint}
-
-已知信息:
-{context if context else "无"}
-
-请提供以下信息（如果能找到）:
-1. 监督/导演 (Director) - 姓名及其代表作
-2. 编剧/剧本 (Writer/Scenario) - 姓名及其代表作
-3. 作曲/音乐 (Composer/Music) - 姓名及其代表作
-4. 制作人 (Producer) - 姓名及其代表作
-5. 所属游戏系列
-6. 值得关注的亮点（如：某知名制作人的新作、某经典系列续作等）
-
-请用以下 JSON 格式返回，找不到的字段留空数组:
-{{
-    "directors": [{{"name": "姓名", "known_for": ["代表作1", "代表作2"]}}],
-    "writers": [{{"name": "姓名", "known_for": ["代表作1"]}}],
-    "composers": [{{"name": "姓名", "known_for": ["代表作1"]}}],
-    "producers": [{{"name": "姓名", "known_for": ["代表作1"]}}],
-    "series": "系列名称",
-    "related_games": ["同制作人的其他作品"],
-    "highlights": ["亮点1", "亮点2"]
-}}
-
-只返回 JSON，不要其他内容。如果完全找不到信息，返回空对象 {{}}。"""
-
-    def fetch(self, game_name: str, basic_info: dict = None) -> Optional[GameDetails]:
-        """获取游戏深度信息"""
-        import requests
-        
-        prompt = self._build_prompt(game_name, basic_info)
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": self.endpoint_id,  # 豆包使用 endpoint_id 作为 model
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "你是一个游戏行业专家，精通游戏制作人员信息。请基于你的知识回答问题，用 JSON 格式返回。"
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.3,
-            "max_tokens": 1500
-        }
-        
-        try:
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-            
-            # 解析 JSON
-            # 处理可能的 markdown 代码块
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            
-            # 尝试找到 JSON 部分
-            start = content.find("{")
-            end = content.rfind("}") + 1
-            if start != -1 and end > start:
-                content = content[start:end]
-            
-            data = json.loads(content.strip())
-            
-            # 构建 GameDetails
-            details = GameDetails(name=game_name)
-            
-            for d in data.get("directors", []):
-                if d.get("name"):
-                    details.directors.append(GameCredit(
-                        name=d.get("name", ""),
-                        role="director",
-                        known_for=d.get("known_for", [])
-                    ))
-            
-            for w in data.get("writers", []):
-                if w.get("name"):
-                    details.writers.append(GameCredit(
-                        name=w.get("name", ""),
-                        role="writer",
-                        known_for=w.get("known_for", [])
-                    ))
-            
-            for c in data.get("composers", []):
-                if c.get("name"):
-                    details.composers.append(GameCredit(
-                        name=c.get("name", ""),
-                        role="composer",
-                        known_for=c.get("known_for", [])
-                    ))
-            
-            for p in data.get("producers", []):
-                if p.get("name"):
-                    details.producers.append(GameCredit(
-                        name=p.get("name", ""),
-                        role="producer",
-                        known_for=p.get("known_for", [])
-                    ))
-            
-            details.series = data.get("series", "")
-            details.related_games = data.get("related_games", [])
-            details.highlights = data.get("highlights", [])
-            
-            return details
-            
-        except requests.RequestException as e:
-            print(f"API 请求失败: {e}")
-            if hasattr(e, 'response') and e.response is not None:
-                print(f"响应内容: {e.response.text}")
-            return None
-        except json.JSONDecodeError as e:
-            print(f"JSON 解析失败: {e}")
-            return None
-        except Exception as e:
-            print(f"获取详情失败: {e}")
-            return None
-    
-    def translate_game_names(self, english_names: list[str]) -> dict[str, str]:
+    def translate_game_names(self, english_names: list[str], max_concurrency: int = 8) -> dict[str, str]:
         """
         批量获取游戏的中文名
         
         Args:
             english_names: 英文游戏名列表
+            max_concurrency: 同时进行的请求数上限
             
         Returns:
             {英文名: 中文名} 字典，找不到中文名的返回原英文名
         """
-        import requests
-        
         if not english_names:
             return {}
         
+        # 同一游戏名只翻译一次
+        unique_names = list(dict.fromkeys(english_names))
+        
         # 分批处理，每批最多 5 个游戏，减少 LLM 混乱
         BATCH_SIZE = 5
-        all_results = {}
+        batches = [
+            unique_names[batch_start:batch_start + BATCH_SIZE]
+            for batch_start in range(0, len(unique_names), BATCH_SIZE)
+        ]
         
-        for batch_start in range(0, len(english_names), BATCH_SIZE):
-            batch = english_names[batch_start:batch_start + BATCH_SIZE]
-            batch_results = self._translate_batch(batch)
-            all_results.update(batch_results)
+        if len(batches) == 1:
+            return self._translate_batch(batches[0])
+        
+        # 各批次互不依赖，并发请求，总耗时接近最慢的一批
+        all_results = {}
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as pool:
+            for batch_results in pool.map(self._translate_batch, batches):
+                all_results.update(batch_results)
         
         return all_results
     
@@ -395,8 +405,6 @@ class DoubaoDetailFetcher(DetailFetcher):
         
         要求 LLM 提供置信度，只采用高置信度的翻译
         """
-        import requests
-        
         if not english_names:
             return {}
         
@@ -406,38 +414,14 @@ class DoubaoDetailFetcher(DetailFetcher):
         prompt = f"""我需要查找以下游戏的官方中文名。
 
 游戏列表：
-{games_list}
-
-请逐个分析每个游戏，返回 JSON 数组。每个元素包含：
-- "en": 原英文名（必须与上面完全一致，直接复制）
-- "cn": 官方中文名
-- "sure": 布尔值，true 表示你100%确定这是正确的官方译名，false 表示不确定
-
-重要规则：
-1. 只填写你100%确定的官方中文译名
-2. 如果你不确定、没听说过这个游戏、或者这个游戏没有中文名，cn 填英文名，sure 填 false
-3. 不要猜测，不要自己翻译，宁可保留英文名也不要填错误的中文名
-4. Tales 系列是"传说"系列，不是"异闻录"；Bayonetta 是"猎天使魔女"
-
-示例：
-[
-  {{"en": "The Legend of Zelda: Tears of the Kingdom", "cn": "塞尔达传说：王国之泪", "sure": true}},
-  {{"en": "Some Unknown Indie Game", "cn": "Some Unknown Indie Game", "sure": false}}
-]
-
-只返回 JSON 数组。"""
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+{games_list}"""
         
         payload = {
-            "model": self.endpoint_id,
+            "model": self.model,
             "messages": [
                 {
                     "role": "system",
-                    "content": "你是游戏翻译专家。只提供你100%确定的官方中文译名，不确定的保留英文名。绝对不要混淆不同的游戏系列。"
+                    "content": _TRANSLATE_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -449,35 +433,14 @@ class DoubaoDetailFetcher(DetailFetcher):
         }
         
         try:
-            response = requests.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=60
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
-            
-            # 解析 JSON 数组
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0]
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0]
-            
-            start = content.find("[")
-            end = content.rfind("]") + 1
-            if start != -1 and end > start:
-                content = content[start:end]
-            
-            translations = json.loads(content.strip())
-            
-            if not isinstance(translations, list):
+            translations = self._complete(payload, 60, "[", "]", list)
+            if translations is None:
                 return {name: name for name in english_names}
             
             # 构建结果，只采用高置信度的翻译
             result_dict = {name: name for name in english_names}
+            # 规范化名 -> 原名，用于大小写不一致时的匹配
+            norm_map = {name.lower().strip(): name for name in english_names}
             
             for item in translations:
                 if not isinstance(item, dict):
@@ -487,7 +450,7 @@ class DoubaoDetailFetcher(DetailFetcher):
                 cn_name = item.get("cn", "")
                 is_sure = item.get("sure", False)
                 
-                if not en_name or not cn_name:
+                if not cn_name:
                     continue
                 
                 # 只采用确定的翻译
@@ -495,30 +458,48 @@ class DoubaoDetailFetcher(DetailFetcher):
                     continue
                 
                 # 额外验证：中文名必须包含中文字符
-                has_chinese = any('\u4e00' <= char <= '\u9fff' for char in cn_name)
+                has_chinese = _CJK_RE.search(cn_name) is not None
                 if not has_chinese:
                     continue
                 
-                # 匹配
-                if en_name in result_dict:
-                    result_dict[en_name] = cn_name
-                else:
-                    en_lower = en_name.lower().strip()
-                    for orig_name in english_names:
-                        if orig_name.lower().strip() == en_lower:
-                            result_dict[orig_name] = cn_name
-                            break
+                # 匹配：原名 -> 规范化名；只有缺少 en 时才按序号匹配
+                # en 对不上说明模型答的是别的游戏，宁可保留英文名也不采用
+                if not en_name:
+                    idx = item.get("id")
+                    if not isinstance(idx, int) or not 1 <= idx <= len(english_names):
+                        continue
+                    en_name = english_names[idx - 1]
+                elif en_name not in result_dict:
+                    en_name = norm_map.get(en_name.lower().strip())
+                    if en_name is None:
+                        continue
+                result_dict[en_name] = cn_name
             
             return result_dict
             
+        except orjson.JSONDecodeError as e:
+            # 模型回复无法解析时逐个重试，避免一个异常回复拖累整批
+            # （响应体不是 JSON 属于请求失败，走下面的通用分支，不逐个重试）
+            if len(english_names) > 1:
+                print(f"翻译结果解析失败，逐个重试: {e}")
+                result_dict = {}
+                for name in english_names:
+                    result_dict.update(self._translate_batch([name]))
+                return result_dict
+            print(f"翻译游戏名失败: {e}")
+            return {name: name for name in english_names}
         except Exception as e:
             print(f"翻译游戏名失败: {e}")
             return {name: name for name in english_names}
 
 
+@lru_cache(maxsize=1)
 def create_fetcher_from_env() -> Optional[DetailFetcher]:
-    """从环境变量创建深度信息获取器"""
-    from dotenv import load_dotenv
+    """
+    从环境变量创建深度信息获取器（进程内只创建一次）
+    
+    返回的实例在整个进程内共享连接池和缓存，调用方不应修改其属性
+    """
     load_dotenv()
     
     # 优先使用豆包大模型 (火山方舟)
@@ -554,6 +535,22 @@ def create_fetcher_from_env() -> Optional[DetailFetcher]:
     return None
 
 
+def invalidate_env_cache():
+    """清除 create_fetcher_from_env 的缓存，下次调用时按当前环境变量重新创建"""
+    create_fetcher_from_env.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def _known_translations() -> dict[str, str]:
+    """读取内置的官方译名表（英文名 -> 中文名）"""
+    try:
+        with open(_KNOWN_TRANSLATIONS_PATH, "rb") as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"读取内置译名表失败: {e}")
+        return {}
+
+
 def translate_game_names(english_names: list[str]) -> dict[str, str]:
     """
     批量翻译游戏名（便捷函数）
@@ -564,20 +561,34 @@ def translate_game_names(english_names: list[str]) -> dict[str, str]:
     Returns:
         {英文名: 中文名} 字典
     """
-    from dotenv import load_dotenv
-    load_dotenv()
+    # 已是中文、在内置译名表中或之前翻译过的游戏名无需调用 LLM
+    known = _known_translations()
+    result = {}
+    todo = []
+    for name in english_names:
+        if _CJK_RE.search(name) is not None:
+            result[name] = name
+        elif name in known:
+            result[name] = known[name]
+        elif (cached := _TRANSLATION_CACHE.get(name)) is not None:
+            result[name] = cached
+        else:
+            todo.append(name)
     
-    ark_key = os.getenv("ARK_API_KEY")
-    ark_endpoint = os.getenv("ARK_ENDPOINT_ID")
-    ark_base = os.getenv("ARK_API_BASE")
+    if not todo:
+        return result
     
-    if ark_key and ark_endpoint:
-        fetcher = DoubaoDetailFetcher(
-            api_key=ark_key,
-            endpoint_id=ark_endpoint,
-            base_url=ark_base.rstrip("/") + "/chat/completions" if ark_base else None
-        )
-        return fetcher.translate_game_names(english_names)
+    # 复用进程内缓存的获取器及其连接
+    fetcher = create_fetcher_from_env()
+    if isinstance(fetcher, DoubaoDetailFetcher):
+        translations = fetcher.translate_game_names(todo)
+        # 只缓存确实译出的中文名；原样返回的可能是请求失败，下次重试
+        for en_name, cn_name in translations.items():
+            if cn_name != en_name:
+                _TRANSLATION_CACHE.set(en_name, cn_name)
+        result.update(translations)
+    else:
+        # 没有配置豆包 API，返回原名
+        result.update((name, name) for name in todo)
     
-    # 没有配置 API，返回原名
-    return {name: name for name in english_names}
+    return result
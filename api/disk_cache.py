@@ -0,0 +1,128 @@
+"""
+本地磁盘缓存
+基于 SQLite 的键值缓存，带过期时间，用于缓存 LLM / IGDB 响应
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+import orjson
+
+
+# 默认缓存目录，可通过 VGAME_CACHE_DIR 环境变量覆盖
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "vgame-horizon")
+
+
+class DiskCache:
+    """
+    SQLite 键值缓存
+
+    首次读写时才打开数据库；目录不可写（如只读的 Serverless 环境）时自动停用，
+    所有读取都视为未命中，不影响正常流程。
+    """
+
+    # 为 True 时 bypassable 缓存的读取视为未命中（写入照常，相当于刷新缓存），供命令行 --no-cache 使用
+    skip_reads = False
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = 7 * 86400,
+        cache_dir: str = None,
+        private: bool = False,
+        bypassable: bool = True
+    ):
+        """
+        Args:
+            name: 缓存名称，对应数据库文件名
+            ttl: 默认过期时间（秒）
+            cache_dir: 缓存目录，默认 ~/.cache/vgame-horizon
+            private: 数据库文件仅当前用户可读写（0600），用于保存凭据
+            bypassable: 是否受 skip_reads 影响；凭据等非数据缓存应设为 False
+        """
+        self.name = name
+        self.ttl = ttl
+        self.private = private
+        self.bypassable = bypassable
+        self.cache_dir = cache_dir or os.getenv("VGAME_CACHE_DIR") or DEFAULT_CACHE_DIR
+        self.enabled = True
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """根据任意可 JSON 序列化的内容生成缓存键"""
+        return hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """打开数据库（调用方需持有锁）"""
+        if self._conn is None and self.enabled:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = os.path.join(self.cache_dir, f"{self.name}.sqlite3")
+                if self.private:
+                    # 先以 0600 创建文件，SQLite 打开已有文件时沿用其权限（日志文件也与之一致）
+                    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+                    os.chmod(path, 0o600)
+                conn = sqlite3.connect(path, check_same_thread=False)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+                conn.commit()
+                self._conn = conn
+            except (OSError, sqlite3.Error) as e:
+                print(f"缓存不可用，已停用 ({self.name}): {e}")
+                self.enabled = False
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中或已过期返回 None"""
+        if DiskCache.skip_reads and self.bypassable:
+            return None
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None or row[1] < time.time():
+            return None
+        return orjson.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float = None) -> None:
+        """写入缓存"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, orjson.dumps(value), expires_at)
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"写入缓存失败 ({self.name}): {e}")
+
+    def delete(self, key: str) -> None:
+        """删除缓存条目"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"删除缓存失败 ({self.name}): {e}")
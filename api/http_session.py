@@ -0,0 +1,61 @@
+"""
+HTTP 连接池
+IGDB 客户端与 LLM 获取器共用的 Session 创建和关闭逻辑，保证两者的重试策略一致
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 单次重试最长等待（秒），同时作为指数退避和 Retry-After 的上限
+MAX_RETRY_WAIT = 30
+
+
+class _CappedRetry(Retry):
+    """Retry-After 等待时间不超过 backoff_max，避免服务端要求的长时间等待卡住工作线程"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.backoff_max)
+
+
+def create_session() -> requests.Session:
+    """
+    创建带连接池和失败重试的 Session
+    
+    429/5xx 按指数退避（带随机抖动，最长 30 秒）重试，429/503 优先遵循 Retry-After（同样最长 30 秒）。
+    读超时不重试：请求可能已被服务端处理（LLM 调用按次计费），重发只会重复计费并成倍拉长等待
+    """
+    session = requests.Session()
+    retry = _CappedRetry(
+        total=5,
+        read=0,
+        backoff_factor=1,
+        backoff_max=MAX_RETRY_WAIT,
+        backoff_jitter=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return session
+
+
+class SessionOwner:
+    """持有 self.session 的客户端基类，提供关闭连接池和上下文管理"""
+    
+    session: requests.Session
+    
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -4,12 +4,31 @@ IGDB API 客户端
 """
 
 import os
+import time
+import orjson
 import requests
+from functools import lru_cache
 from datetime import datetime, timezone
 from typing import Optional
 
+from dotenv import load_dotenv
 
-class IGDBClient:
+from disk_cache import DiskCache
+from http_session import SessionOwner, create_session
+
+
+# 令牌提前 60 秒视为过期，避免请求途中失效
+_TOKEN_EXPIRY_MARGIN = 60
+
+# Twitch 访问令牌缓存，新进程可直接复用，无需重新认证
+# 令牌属于凭据：文件仅当前用户可读写，且不受 --no-cache 影响
+_TOKEN_CACHE = DiskCache("igdb_token", ttl=3600, private=True, bypassable=False)
+
+# IGDB 查询结果缓存（1 小时），相同查询语句直接复用
+_QUERY_CACHE = DiskCache("igdb", ttl=3600)
+
+
+class IGDBClient(SessionOwner):
     """IGDB API 客户端"""
     
     # 平台 ID
@@ -18,11 +37,38 @@ class IGDBClient:
     PLATFORM_XBOX_SERIES = 169
     PLATFORM_PC = 6
     
+    # /multiquery 单次请求最多包含的子查询数
+    MULTIQUERY_LIMIT = 10
+    
     def __init__(self, client_id: str, client_secret: str):
         self.client_id = client_id
         self.client_secret = client_secret
         self.access_token: Optional[str] = None
+        self._expires_at = 0.0
         self.base_url = "https://api.igdb.com/v4"
+        # 复用 TCP/TLS 连接，避免每次请求重新握手
+        self.session = create_session()
+        # 查询结果缓存，认证请求不经过此缓存
+        self.cache = _QUERY_CACHE
+        self._token_key = DiskCache.make_key("token", client_id)
+        self._load_token()
+    
+    def _load_token(self):
+        """从磁盘缓存读取未过期的访问令牌"""
+        cached = _TOKEN_CACHE.get(self._token_key)
+        if cached and cached.get("expires_at", 0) > time.time():
+            self.access_token = cached.get("access_token")
+            self._expires_at = cached["expires_at"]
+    
+    def _invalidate_token(self):
+        """丢弃内存和磁盘中的访问令牌"""
+        _TOKEN_CACHE.delete(self._token_key)
+        self.access_token = None
+        self._expires_at = 0.0
+    
+    def _token_valid(self) -> bool:
+        """访问令牌是否存在且未过期"""
+        return bool(self.access_token) and time.time() < self._expires_at
     
     def authenticate(self) -> bool:
         """获取 Twitch OAuth 访问令牌"""
@@ -34,34 +80,61 @@ class IGDBClient:
         }
         
         try:
-            response = requests.post(url, params=params)
+            response = self.session.post(url, params=params)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             self.access_token = data.get("access_token")
+            expires_in = max(data.get("expires_in", 3600) - _TOKEN_EXPIRY_MARGIN, 0)
+            self._expires_at = time.time() + expires_in
+            if self.access_token and expires_in:
+                _TOKEN_CACHE.set(
+                    self._token_key,
+                    {"access_token": self.access_token, "expires_at": self._expires_at},
+                    ttl=expires_in
+                )
             return True
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             print(f"认证失败: {e}")
             return False
     
-    def _request(self, endpoint: str, query: str) -> list:
-        """发送 API 请求"""
-        if not self.access_token:
-            if not self.authenticate():
-                return []
-        
+    def _post(self, url: str, query: str) -> requests.Response:
+        """携带当前访问令牌发送查询"""
         headers = {
             "Client-ID": self.client_id,
             "Authorization": f"Bearer {self.access_token}",
             "Accept": "application/json"
         }
-        
+        return self.session.post(url, headers=headers, data=query)
+    
+    def _request(self, endpoint: str, query: str) -> list:
+        """发送 API 请求"""
         url = f"{self.base_url}/{endpoint}"
         
+        # 命中缓存时无需认证
+        cache_key = DiskCache.make_key(url, query)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if not self._token_valid():
+            if not self.authenticate():
+                return []
+        
         try:
-            response = requests.post(url, headers=headers, data=query)
+            response = self._post(url, query)
+            # 令牌被吊销或已失效：丢弃缓存的令牌，重新认证后重试一次
+            if response.status_code == 401:
+                self._invalidate_token()
+                if not self.authenticate():
+                    return []
+                response = self._post(url, query)
             response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
+            results = orjson.loads(response.content)
+            # 空结果可能是数据尚未录入，不缓存
+            if results:
+                self.cache.set(cache_key, results)
+            return results
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             print(f"API 请求失败: {e}")
             return []
     
@@ -119,17 +192,10 @@ class IGDBClient:
         
         return self._request("games", query)
     
-    def get_game_details(self, game_id: int) -> dict:
-        """
-        获取游戏详细信息（包括制作人员）
-        
-        Args:
-            game_id: 游戏 ID
-            
-        Returns:
-            游戏详情
-        """
-        query = f"""
+    @staticmethod
+    def _details_query(game_id: int) -> str:
+        """游戏详情查询语句"""
+        return f"""
             fields name, summary, storyline, first_release_date,
                    involved_companies.company.name,
                    involved_companies.developer,
@@ -147,10 +213,73 @@ class IGDBClient:
                    url;
             where id = {game_id};
         """
+    
+    @staticmethod
+    def _search_query(keyword: str, platform_id: int = None, limit: int = 20) -> str:
+        """搜索查询语句"""
+        platform_filter = f"& platforms = ({platform_id})" if platform_id else ""
+        
+        return f"""
+            search "{keyword}";
+            fields name, summary, first_release_date,
+                   involved_companies.company.name,
+                   involved_companies.developer,
+                   cover.url,
+                   platforms.name;
+            where category = 0 {platform_filter};
+            limit {limit};
+        """
+    
+    def _multiquery(self, queries: dict[str, str], endpoint: str = "games") -> dict[str, list]:
+        """
+        通过 /multiquery 一次发送多个查询（IGDB 每次最多 10 个）
+        
+        Args:
+            queries: 子查询名 -> 查询语句
+            endpoint: 子查询使用的端点
+            
+        Returns:
+            子查询名 -> 结果列表，失败的子查询不出现在结果中
+        """
+        names = list(queries)
+        results = {}
+        for i in range(0, len(names), self.MULTIQUERY_LIMIT):
+            body = "".join(
+                f'query {endpoint} "{name}" {{{queries[name]}}};\n'
+                for name in names[i:i + self.MULTIQUERY_LIMIT]
+            )
+            for item in self._request("multiquery", body):
+                if isinstance(item, dict) and "name" in item:
+                    results[item["name"]] = item.get("result") or []
+        return results
+    
+    def get_game_details(self, game_id: int) -> dict:
+        """
+        获取游戏详细信息（包括制作人员）
         
-        results = self._request("games", query)
+        Args:
+            game_id: 游戏 ID
+            
+        Returns:
+            游戏详情
+        """
+        results = self._request("games", self._details_query(game_id))
         return results[0] if results else {}
     
+    def get_game_details_many(self, game_ids: list[int]) -> dict[int, dict]:
+        """
+        批量获取游戏详细信息，每 10 个游戏合并为一次请求
+        
+        Args:
+            game_ids: 游戏 ID 列表
+            
+        Returns:
+            游戏 ID -> 游戏详情，未找到的游戏不出现在结果中
+        """
+        queries = {str(gid): self._details_query(gid) for gid in dict.fromkeys(game_ids)}
+        results = self._multiquery(queries)
+        return {int(name): result[0] for name, result in results.items() if result}
+    
     def search_games(self, keyword: str, platform_id: int = None, limit: int = 20) -> list:
         """
         搜索游戏
@@ -163,25 +292,36 @@ class IGDBClient:
         Returns:
             游戏列表
         """
-        platform_filter = f"& platforms = ({platform_id})" if platform_id else ""
-        
-        query = f"""
-            search "{keyword}";
-            fields name, summary, first_release_date,
-                   involved_companies.company.name,
-                   involved_companies.developer,
-                   cover.url,
-                   platforms.name;
-            where category = 0 {platform_filter};
-            limit {limit};
+        return self._request("games", self._search_query(keyword, platform_id, limit))
+    
+    def search_games_many(self, keywords: list[str], platform_id: int = None, limit: int = 20) -> dict[str, list]:
         """
+        批量搜索游戏，每 10 个关键词合并为一次请求
         
-        return self._request("games", query)
+        Args:
+            keywords: 搜索关键词列表
+            platform_id: 可选，平台过滤
+            limit: 每个关键词的返回数量限制
+            
+        Returns:
+            关键词 -> 游戏列表
+        """
+        keywords = list(dict.fromkeys(keywords))
+        queries = {
+            str(i): self._search_query(keyword, platform_id, limit)
+            for i, keyword in enumerate(keywords)
+        }
+        results = self._multiquery(queries)
+        return {keyword: results.get(str(i), []) for i, keyword in enumerate(keywords)}
 
 
+@lru_cache(maxsize=1)
 def create_client_from_env() -> Optional[IGDBClient]:
-    """从环境变量创建客户端"""
-    from dotenv import load_dotenv
+    """
+    从环境变量创建客户端（进程内只创建一次）
+    
+    返回的实例在整个进程内共享连接池，调用方不应修改其属性
+    """
     load_dotenv()
     
     client_id = os.getenv("TWITCH_CLIENT_ID")
@@ -193,3 +333,8 @@ def create_client_from_env() -> Optional[IGDBClient]:
         return None
     
     return IGDBClient(client_id, client_secret)
+
+
+def invalidate_env_cache():
+    """清除 create_client_from_env 的缓存，下次调用时按当前环境变量重新创建"""
+    create_client_from_env.cache_clear()
@@ -5,7 +5,10 @@ MVP 版本：命令行界面
 """
 
 import argparse
+import re
+from collections import defaultdict
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional
 
 from rich.console import Console
@@ -17,25 +20,38 @@ from rich import box
 
 from igdb_client import create_client_from_env, IGDBClient
 from detail_fetcher import create_fetcher_from_env, GameDetails, translate_game_names
+from disk_cache import DiskCache
 
 
 console = Console()
 
+_UTC = timezone.utc
+
+# 中文字符（CJK 统一表意文字）
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# alternative_names.comment 中表示中文名的关键字（小写）
+_ZH_HINTS = ("chinese", "中文", "简体", "繁体")
+
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(timestamp: int, fmt: str) -> str:
+    """按 UTC 格式化时间戳（同一天发售的游戏时间戳大量重复，结果可缓存）"""
+    return datetime.fromtimestamp(timestamp, tz=_UTC).strftime(fmt)
+
 
 def format_date(timestamp: Optional[int]) -> str:
     """格式化 Unix 时间戳为日期字符串"""
     if not timestamp:
         return "TBA"
-    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-    return dt.strftime("%Y-%m-%d")
+    return _format_timestamp(timestamp, "%Y-%m-%d")
 
 
 def format_date_short(timestamp: Optional[int]) -> str:
     """格式化为短日期（仅日）"""
     if not timestamp:
         return "TBA"
-    dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-    return dt.strftime("%m/%d")
+    return _format_timestamp(timestamp, "%m/%d")
 
 
 def get_companies(game: dict, role: str = "developer") -> str:
@@ -67,6 +83,30 @@ def get_companies(game: dict, role: str = "developer") -> str:
     return ", ".join(companies) if companies else "-"
 
 
+def get_companies_split(game: dict) -> tuple[str, str]:
+    """
+    一次遍历同时获取开发商和发行商
+    
+    Args:
+        game: 游戏数据
+        
+    Returns:
+        (开发商, 发行商)，多个用逗号分隔，没有则为 "-"
+    """
+    developers = []
+    publishers = []
+    for ic in game.get("involved_companies") or ():
+        company = ic.get("company", {})
+        if not isinstance(company, dict):
+            continue
+        if ic.get("developer"):
+            developers.append(company.get("name", ""))
+        if ic.get("publisher"):
+            publishers.append(company.get("name", ""))
+    
+    return ", ".join(developers) or "-", ", ".join(publishers) or "-"
+
+
 def get_genres(game: dict) -> str:
     """获取游戏类型"""
     genres = game.get("genres", [])
@@ -84,12 +124,32 @@ def truncate_text(text: str, max_length: int = 80) -> str:
     return text[:max_length - 3] + "..."
 
 
+def _get_alt_chinese_name(game: dict) -> Optional[str]:
+    """从 IGDB 的 alternative_names 中提取中文名"""
+    for alt in game.get("alternative_names") or ():
+        if not isinstance(alt, dict):
+            continue
+        
+        name = alt.get("name", "")
+        comment = (alt.get("comment") or "").lower()
+        
+        # 检查是否是中文名（通过 comment 标注或包含中文字符）
+        if any(hint in comment for hint in _ZH_HINTS):
+            return name
+        
+        # 检查名称本身是否包含中文字符
+        if _CJK_RE.search(name):
+            return name
+    
+    return None
+
+
 def get_chinese_name(game: dict) -> Optional[str]:
     """
     获取游戏的中文名
     
     优先级：
-    1. 通过 LLM 翻译后添加的 _cn_name 字段
+    1. 通过 LLM 翻译后添加的 _cn_name 字段（只在与英文名不同时才会设置）
     2. IGDB 的 alternative_names 中的中文名
     
     Args:
@@ -98,34 +158,7 @@ def get_chinese_name(game: dict) -> Optional[str]:
     Returns:
         中文名，如果没有则返回 None
     """
-    # 优先使用 LLM 翻译的结果
-    if game.get("_cn_name"):
-        cn_name = game["_cn_name"]
-        # 如果中文名和英文名不同，才返回
-        if cn_name != game.get("name"):
-            return cn_name
-    
-    # 备用：从 IGDB 的 alternative_names 中提取
-    alt_names = game.get("alternative_names", [])
-    if not alt_names:
-        return None
-    
-    for alt in alt_names:
-        if not isinstance(alt, dict):
-            continue
-        
-        name = alt.get("name", "")
-        comment = alt.get("comment", "").lower() if alt.get("comment") else ""
-        
-        # 检查是否是中文名（通过 comment 标注或包含中文字符）
-        if "chinese" in comment or "中文" in comment or "简体" in comment or "繁体" in comment:
-            return name
-        
-        # 检查名称本身是否包含中文字符
-        if any('\u4e00' <= char <= '\u9fff' for char in name):
-            return name
-    
-    return None
+    return game.get("_cn_name") or _get_alt_chinese_name(game)
 
 
 def get_display_name(game: dict) -> tuple[str, Optional[str]]:
@@ -172,7 +205,7 @@ def enrich_games_with_chinese_names(games: list) -> list:
         games: 游戏列表
         
     Returns:
-        添加了 _cn_name 字段的游戏列表
+        译出中文名的游戏添加了 _cn_name 字段的游戏列表
     """
     if not games:
         return games
@@ -188,11 +221,12 @@ def enrich_games_with_chinese_names(games: list) -> list:
     # 批量翻译
     translations = translate_game_names(english_names)
     
-    # 添加中文名到游戏数据
+    # 添加中文名到游戏数据，与英文名相同的不设置，显示时只需判断真假
     for game in games:
         en_name = game.get("name", "")
-        if en_name in translations:
-            game["_cn_name"] = translations[en_name]
+        cn_name = translations.get(en_name)
+        if cn_name and cn_name != en_name:
+            game["_cn_name"] = cn_name
     
     return games
 
@@ -212,68 +246,51 @@ def display_game_details(details: GameDetails):
     ))
     console.print()
     
+    # 先拼好全部内容再一次性输出，避免逐行 print 的开销
+    lines: list[Text] = []
+    
     # 制作人员
+    credit_sections = (
+        ("🎬 监督/导演", details.directors),
+        ("✍️  编剧/剧本", details.writers),
+        ("🎵 作曲/音乐", details.composers),
+        ("🎯 制作人", details.producers),
+    )
     has_credits = False
-    
-    if details.directors:
-        has_credits = True
-        console.print("[bold cyan]🎬 监督/导演[/bold cyan]")
-        for credit in details.directors:
-            known_for = ", ".join(credit.known_for) if credit.known_for else "暂无"
-            console.print(f"   • {credit.name}")
-            console.print(f"     [dim]代表作: {known_for}[/dim]")
-        console.print()
-    
-    if details.writers:
-        has_credits = True
-        console.print("[bold cyan]✍️  编剧/剧本[/bold cyan]")
-        for credit in details.writers:
-            known_for = ", ".join(credit.known_for) if credit.known_for else "暂无"
-            console.print(f"   • {credit.name}")
-            console.print(f"     [dim]代表作: {known_for}[/dim]")
-        console.print()
-    
-    if details.composers:
-        has_credits = True
-        console.print("[bold cyan]🎵 作曲/音乐[/bold cyan]")
-        for credit in details.composers:
-            known_for = ", ".join(credit.known_for) if credit.known_for else "暂无"
-            console.print(f"   • {credit.name}")
-            console.print(f"     [dim]代表作: {known_for}[/dim]")
-        console.print()
-    
-    if details.producers:
+    for title, credits in credit_sections:
+        if not credits:
+            continue
         has_credits = True
-        console.print("[bold cyan]🎯 制作人[/bold cyan]")
-        for credit in details.producers:
+        lines.append(Text(title, style="bold cyan"))
+        for credit in credits:
             known_for = ", ".join(credit.known_for) if credit.known_for else "暂无"
-            console.print(f"   • {credit.name}")
-            console.print(f"     [dim]代表作: {known_for}[/dim]")
-        console.print()
+            lines.append(Text(f"   • {credit.name}"))
+            lines.append(Text(f"     代表作: {known_for}", style="dim"))
+        lines.append(Text())
     
     # 系列信息
     if details.series:
-        console.print(f"[bold cyan]📚 所属系列[/bold cyan]")
-        console.print(f"   {details.series}")
-        console.print()
+        lines.append(Text("📚 所属系列", style="bold cyan"))
+        lines.append(Text(f"   {details.series}"))
+        lines.append(Text())
     
     # 关联作品
     if details.related_games:
-        console.print("[bold cyan]🔗 关联作品[/bold cyan]")
-        for game in details.related_games:
-            console.print(f"   • {game}")
-        console.print()
+        lines.append(Text("🔗 关联作品", style="bold cyan"))
+        lines.extend(Text(f"   • {game}") for game in details.related_games)
+        lines.append(Text())
     
     # 亮点
     if details.highlights:
-        console.print("[bold cyan]⭐ 值得关注[/bold cyan]")
-        for highlight in details.highlights:
-            console.print(f"   • {highlight}")
-        console.print()
+        lines.append(Text("⭐ 值得关注", style="bold cyan"))
+        lines.extend(Text(f"   • {highlight}") for highlight in details.highlights)
+        lines.append(Text())
     
     if not has_credits and not details.series and not details.highlights:
-        console.print("[yellow]暂未找到该游戏的详细制作信息[/yellow]")
-        console.print()
+        lines.append(Text("暂未找到该游戏的详细制作信息", style="yellow"))
+        lines.append(Text())
+    
+    console.print(Text("\n").join(lines))
 
 
 def display_timeline(games: list, year: int, month: int):
@@ -295,40 +312,38 @@ def display_timeline(games: list, year: int, month: int):
     console.print()
     
     # 按日期分组
-    games_by_date = {}
+    games_by_date = defaultdict(list)
     for game in games:
-        date_str = format_date(game.get("first_release_date"))
-        if date_str not in games_by_date:
-            games_by_date[date_str] = []
-        games_by_date[date_str].append(game)
-    
-    # 按日期排序展示
-    for date_str in sorted(games_by_date.keys()):
-        date_games = games_by_date[date_str]
+        games_by_date[format_date(game.get("first_release_date"))].append(game)
+    
+    # 按日期排序展示（未定档的 TBA 排在最后），每个日期拼成一段文本后一次性输出
+    for date_str, date_games in sorted(games_by_date.items(), key=lambda kv: (kv[0] == "TBA", kv[0])):
         
         # 日期标签
-        console.print(f"[bold green]📅 {date_str}[/bold green]")
-        console.print("─" * 60)
+        lines = [
+            Text(f"📅 {date_str}", style="bold green"),
+            Text("─" * 60)
+        ]
         
         for game in date_games:
             name = game.get("name", "Unknown")
-            developer = get_companies(game, "developer")
-            publisher = get_companies(game, "publisher")
+            developer, publisher = get_companies_split(game)
             genres = get_genres(game)
             summary = truncate_text(game.get("summary", ""), 100)
             
             # 游戏名称
-            console.print(f"  [bold white]🎯 {name}[/bold white]")
+            lines.append(Text(f"  🎯 {name}", style="bold white"))
             
             # 详细信息
-            console.print(f"     [dim]开发商:[/dim] {developer}")
-            console.print(f"     [dim]发行商:[/dim] {publisher}")
-            console.print(f"     [dim]类型:[/dim] {genres}")
+            lines.append(Text.assemble("     ", ("开发商:", "dim"), f" {developer}"))
+            lines.append(Text.assemble("     ", ("发行商:", "dim"), f" {publisher}"))
+            lines.append(Text.assemble("     ", ("类型:", "dim"), f" {genres}"))
             if summary != "-":
-                console.print(f"     [dim]简介:[/dim] {summary}")
-            console.print()
+                lines.append(Text.assemble("     ", ("简介:", "dim"), f" {summary}"))
+            lines.append(Text())
         
-        console.print()
+        lines.append(Text())
+        console.print(Text("\n").join(lines))
 
 
 def display_table(games: list, year: int, month: int):
@@ -344,27 +359,32 @@ def display_table(games: list, year: int, month: int):
         console.print(f"[yellow]📭 {year}年{month}月 暂无 Switch 新游数据[/yellow]")
         return
     
+    # 不画行分隔线、列宽固定且不换行，Rich 无需逐格测量和重排
     table = Table(
         title=f"🎮 {year}年{month}月 Switch 新游列表",
-        box=box.ROUNDED,
-        header_style="bold cyan",
-        show_lines=True
+        box=box.SIMPLE,
+        header_style="bold cyan"
     )
     
-    table.add_column("日期", style="green", width=10)
-    table.add_column("游戏名称", style="bold white", width=30)
-    table.add_column("开发商", style="yellow", width=20)
-    table.add_column("类型", style="magenta", width=15)
-    table.add_column("简介", style="dim", width=40)
-    
-    for game in games:
-        table.add_row(
-            format_date_short(game.get("first_release_date")),
-            game.get("name", "Unknown"),
-            get_companies(game, "developer"),
-            get_genres(game),
-            truncate_text(game.get("summary", ""), 60)
+    table.add_column("日期", style="green", width=10, no_wrap=True)
+    table.add_column("游戏名称", style="bold white", width=30, no_wrap=True, overflow="ellipsis")
+    table.add_column("开发商", style="yellow", width=20, no_wrap=True, overflow="ellipsis")
+    table.add_column("类型", style="magenta", width=15, no_wrap=True, overflow="ellipsis")
+    table.add_column("简介", style="dim", width=40, no_wrap=True, overflow="ellipsis")
+    
+    # 单元格用纯文本 Text，跳过 markup 解析
+    rows = [
+        (
+            Text(format_date_short(game.get("first_release_date"))),
+            Text(game.get("name", "Unknown")),
+            Text(get_companies(game, "developer")),
+            Text(get_genres(game)),
+            Text(truncate_text(game.get("summary", ""), 60))
         )
+        for game in games
+    ]
+    for row in rows:
+        table.add_row(*row)
     
     console.print(table)
     console.print(f"\n[dim]共 {len(games)} 款游戏[/dim]")
@@ -390,21 +410,29 @@ def display_compact(games: list, year: int, month: int, show_index: bool = False
     ))
     console.print()
     
+    # 每行直接用带样式的 Text 拼接，无需解析 markup，游戏名中的 [ 也不会被误解析
+    lines = []
     for idx, game in enumerate(games, 1):
         date = format_date_short(game.get("first_release_date"))
         en_name, cn_name = get_display_name(game)
         developer = get_companies(game, "developer")
         
+        line = Text()
+        if show_index:
+            line.append(f"{idx:2}.", style="cyan")
+            line.append(" ")
+        line.append(date, style="green")
+        line.append(" | ")
         # 构建名称显示：有中文名则显示 "中文名 (英文名)"
         if cn_name:
-            name_display = f"{cn_name} [dim]({en_name})[/dim]"
+            line.append(cn_name, style="bold")
+            line.append(f" ({en_name})", style="bold dim")
         else:
-            name_display = en_name
-        
-        if show_index:
-            console.print(f"[cyan]{idx:2}.[/cyan] [green]{date}[/green] | [bold]{name_display}[/bold] [dim]- {developer}[/dim]")
-        else:
-            console.print(f"[green]{date}[/green] | [bold]{name_display}[/bold] [dim]- {developer}[/dim]")
+            line.append(en_name, style="bold")
+        line.append(f" - {developer}", style="dim")
+        lines.append(line)
+    
+    console.print(Text("\n").join(lines))
     
     console.print()
 
@@ -466,9 +494,10 @@ def interactive_mode(games: list, year: int, month: int):
                 console.print(f"[dim]正在获取《{display_name}》的深度信息...[/dim]")
                 
                 # 构建基础信息，包含中英文名
+                developer, publisher = get_companies_split(game)
                 basic_info = {
-                    "developer": get_companies(game, "developer"),
-                    "publisher": get_companies(game, "publisher"),
+                    "developer": developer,
+                    "publisher": publisher,
                     "release_date": format_date(game.get("first_release_date")),
                     "english_name": en_name,
                     "chinese_name": cn_name
@@ -527,6 +556,7 @@ def main():
   python main.py --format compact       # 紧凑模式
   python main.py -i                     # 交互模式（可查看深度信息）
   python main.py --detail "塞尔达传说"   # 直接查询游戏深度信息
+  python main.py --no-cache             # 忽略本地缓存重新获取
         """
     )
     
@@ -566,9 +596,17 @@ def main():
         type=str,
         help="直接查询指定游戏的深度信息"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="忽略本地缓存，重新请求 IGDB 和 LLM（结果仍会写入缓存）"
+    )
     
     args = parser.parse_args()
     
+    if args.no_cache:
+        DiskCache.skip_reads = True
+    
     # 直接查询深度信息模式
     if args.detail:
         fetch_single_game_detail(args.detail)